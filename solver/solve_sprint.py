@@ -8,7 +8,7 @@ Sprint Planning MILP (PuLP)
 Data: data/*.csv + data/config.yaml
 Outputs: results/*.csv + results/summary.txt
 """
-import os, csv, yaml, math, sys
+import os, yaml, math, sys, time
 from collections import defaultdict
 
 BASE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -17,21 +17,20 @@ OUT  = os.path.join(BASE, "results")
 os.makedirs(OUT, exist_ok=True)
 
 try:
+    import numpy as np
+    import pandas as pd
     import pulp as pl
 except Exception as e:
-    print("PuLP no está instalado en este entorno.\n"
+    print("PuLP/NumPy/pandas no están instalados en este entorno.\n"
           "Para ejecutar localmente:\n"
-          "  pip install pulp\n"
+          "  pip install -r requirements.txt\n"
           "Luego corre: python solver/solve_sprint.py\n")
     sys.exit(0)
 
 # ---------- Load data ----------
-with open(os.path.join(DATA,"people.csv"),encoding="utf-8") as f:
-    people_rows = list(csv.DictReader(f))
-with open(os.path.join(DATA,"stories.csv"),encoding="utf-8") as f:
-    story_rows = list(csv.DictReader(f))
-with open(os.path.join(DATA,"roles.csv"),encoding="utf-8") as f:
-    role_rows = list(csv.DictReader(f))
+people_df = pd.read_csv(os.path.join(DATA,"people.csv"), dtype={"person":str, "role":str})
+stories_df = pd.read_csv(os.path.join(DATA,"stories.csv"), dtype={"story_id":str, "depends_on":str})
+roles_df = pd.read_csv(os.path.join(DATA,"roles.csv"), dtype={"role":str})
 with open(os.path.join(DATA,"config.yaml"),encoding="utf-8") as f:
     CFG = yaml.safe_load(f)
 
@@ -44,162 +43,496 @@ theta_release_hours = float(CFG["min_hours_to_count_release"])
 qa_cov_factor = float(CFG["qa_coverage_factor"])
 wip_factor_QA = float(CFG["wip_factor_QA_capacity"])
 forbid_points = set(int(x) for x in CFG.get("forbid_points",[]))
+solver_name = str(CFG.get("solver","auto")).upper()
+time_limit_s = CFG.get("time_limit_s", 120)
+time_limit_s = None if time_limit_s is None else float(time_limit_s)  # null: no time limit
+mip_gap_rel = float(CFG.get("mip_gap_rel", 0.01))
+n_threads = os.cpu_count() or 1
+lp_only = bool(CFG.get("lp_only", False))
 
-I = [p["person"] for p in people_rows]
-role_of = {p["person"]:p["role"] for p in people_rows}
-cap_i = {p["person"]: float(p["capacity_hours"]) for p in people_rows}
-I_by_role = defaultdict(list)
-for i in I:
-    I_by_role[ role_of[i] ].append(i)
-
-S_all = [s["story_id"] for s in story_rows]
-S = [s["story_id"] for s in story_rows if int(s["points"]) not in forbid_points]
-points = {s["story_id"]: int(s["points"]) for s in story_rows if int(s["points"]) not in forbid_points}
-value  = {s["story_id"]: float(s["value"]) for s in story_rows if int(s["points"]) not in forbid_points}
-
-deps = []
-for s in story_rows:
-    sid = s["story_id"]
-    if int(s["points"]) in forbid_points: 
-        continue
-    dep = (s.get("depends_on") or "").strip()
-    if dep:
-        deps.append((sid, dep))
-
-R = [r["role"] for r in role_rows]
-role_share = {r["role"]: float(r["share_of_hours"]) for r in role_rows}
-mtg_per_story = {r["role"]: float(r["meeting_load_per_story_hours"]) for r in role_rows}
-bug_hours_per_bug = {r["role"]: float(r["bug_hours_per_bug"]) for r in role_rows}
-
-# Per-story required hours by role
-hrs_tot = {s: points[s]*hours_per_point for s in S}
-req = {(s,"BE"): role_share.get("BE",0.0)*hrs_tot[s] for s in S}
-req.update({(s,"FE"): role_share.get("FE",0.0)*hrs_tot[s] for s in S})
-req.update({(s,"QA"): role_share.get("QA",0.0)*hrs_tot[s]*qa_cov_factor for s in S})
-req.update({(s,"TL"): role_share.get("TL",0.0)*hrs_tot[s] for s in S})
-req.update({(s,"ARQ"):role_share.get("ARQ",0.0)*hrs_tot[s] for s in S})
+# ---------- Solver backend ----------
+def pick_solver(name="AUTO"):
+    """Return the requested PuLP solver, or the fastest available one for 'AUTO'.
 
+    Probe order: Gurobi (CMD) -> HiGHS in-process (highspy, no MPS file round-trip) -> HiGHS (CMD) -> CBC.
+    All backends stop at mip_gap or after time_limit_s, keeping the incumbent;
+    only the CMD backends (warmStart) read the greedy plan as a MIP start.
+    """
+    candidates = {
+        "GUROBI_CMD": lambda: pl.GUROBI_CMD(msg=False, threads=n_threads, timeLimit=time_limit_s,
+                                            gapRel=mip_gap, warmStart=True),
+        "HIGHS":      lambda: pl.HiGHS(msg=False, threads=n_threads, timeLimit=time_limit_s,
+                                       gapRel=mip_gap, parallel="on"),
+        "HIGHS_CMD":  lambda: pl.HiGHS_CMD(msg=False, threads=n_threads, warmStart=True, timeLimit=time_limit_s,
+                                           gapRel=mip_gap, options=["parallel=on"]),
+        "PULP_CBC_CMD": lambda: pl.PULP_CBC_CMD(msg=False, threads=n_threads, presolve=True,
+                                                cuts=True, strong=5, timeLimit=time_limit_s, gapRel=mip_gap,
+                                                warmStart=True,
+                                                options=["randomCbcSeed 1","preprocess equal","heuristics on"]),
+    }
+    if name != "AUTO":
+        if name not in candidates:
+            print(f"Solver desconocido en config.yaml: {name}. Opciones: auto, {', '.join(candidates)}, SCIPY_MILP")
+            sys.exit(1)
+        solver = candidates[name]()
+        if not solver.available():
+            print(f"El solver {name} no está disponible en este entorno.")
+            sys.exit(1)
+        return solver
+    for make in candidates.values():
+        solver = make()
+        if solver.available():
+            return solver
+    print("No se encontró ningún solver MILP disponible para PuLP.")
+    sys.exit(1)
+
+I = people_df.person.tolist()
+role_of = dict(zip(people_df.person, people_df.role))
+cap_i = dict(zip(people_df.person, people_df.capacity_hours.astype(float).tolist()))
+# Role membership as SoA: role_code[a] per person (-1 outside ROLES), idx_of[r] = person positions
+ROLES = ("BE","FE","QA","TL","ARQ")
+ROLE_CODES = {r: c for c, r in enumerate(ROLES)}
+role_code = np.array([ROLE_CODES.get(role_of[i], -1) for i in I], dtype=np.int8)
+idx_of = {r: np.where(role_code == c)[0] for r, c in ROLE_CODES.items()}
+# A role is present if it has people or is listed in roles.csv: a listed role with nobody in it
+# keeps its Req rows, so stories that need its hours cannot be selected
+role_listed = set(roles_df.role)
+staffed = np.array([len(idx_of[r]) > 0 or r in role_listed for r in ROLES])
+staffed_roles = [r for r, ok in zip(ROLES, staffed) if ok]
+
+S_all = stories_df.story_id.tolist()
+stories_df = stories_df[~stories_df.points.isin(forbid_points)]
+S = stories_df.story_id.tolist()
+pts = stories_df.points.to_numpy(dtype=np.int32)
+val = stories_df.value.to_numpy(dtype=np.float64)
+points = dict(zip(S, pts.tolist()))
+value  = dict(zip(S, val.tolist()))
+
+# depends_on is optional, as with csv.DictReader's s.get("depends_on") before
+depends_on = stories_df.get("depends_on", pd.Series("", index=stories_df.index)).fillna("")
+deps = [(sid, dep.strip()) for sid, dep in zip(S, depends_on) if dep.strip()]
+
+R = roles_df.role.tolist()
+role_share = dict(zip(R, roles_df.share_of_hours.astype(float).tolist()))
+mtg_per_story = dict(zip(R, roles_df.meeting_load_per_story_hours.astype(float).tolist()))
+bug_hours_per_bug = dict(zip(R, roles_df.bug_hours_per_bug.astype(float).tolist()))
+
+# Per-story required hours by role: req_matrix[s_idx, r_idx] = share_r * hrs_tot_s (+ meetings)
+hrs_tot = pts * hours_per_point
+share = np.array([role_share.get(r,0.0) for r in ROLES])
+share[ROLES.index("QA")] *= qa_cov_factor
 # Add meeting load per story (we charge QA by default)
-for s in S:
-    for r in ("QA","TL"):
-        extra = mtg_per_story.get(r,0.0)
-        if extra>0:
-            req[(s,r)] += extra
+mtg = np.array([max(mtg_per_story.get(r,0.0), 0.0) if r in ("QA","TL") else 0.0 for r in ROLES])
+req_matrix = hrs_tot[:,None] * share[None,:] + mtg[None,:]
 
 # Aggregate role capacities and bug reservations
-role_cap = {r: sum(cap_i[i] for i in I_by_role[r]) for r in R}
+cap_arr = np.array([cap_i[i] for i in I])
+role_arr = np.array([role_of[i] for i in I])
+role_cap = {r: float(cap_arr[role_arr == r].sum()) for r in R}
 role_bug_reserve = {r: bugs_per_sprint * bug_hours_per_bug.get(r,0.0) for r in R}
 role_cap_eff = {r: role_cap.get(r,0.0) - role_bug_reserve.get(r,0.0) for r in R}
 # QA WIP buffer
 role_cap_eff["QA"] = min(role_cap_eff.get("QA",0.0), role_cap.get("QA",0.0)*wip_factor_QA)
 
-# ---------- Model ----------
-m = pl.LpProblem("SprintPlanningMILP", pl.LpMaximize)
+# Prune stories that can never be selected: some staffed role needs more hours than its
+# effective capacity, or the story has more points than any dev may own. Stories depending
+# on a pruned story go too (the Dep row would force them to 0 anyway).
+n_stories = len(S)
+cap_eff_vec = np.array([role_cap_eff.get(r,0.0) for r in ROLES])
+feasible = (((req_matrix <= cap_eff_vec[None,:]) | (req_matrix <= 0) | ~staffed[None,:]).all(axis=1)
+            & (pts <= max_points_per_dev))
+pos = {s: k for k, s in enumerate(S)}
+changed = True
+while changed:
+    changed = False
+    for (s,p) in deps:
+        if p in pos and feasible[pos[s]] and not feasible[pos[p]]:
+            feasible[pos[s]] = False
+            changed = True
+S = [s for s, ok in zip(S, feasible) if ok]
+pts, val, hrs_tot, req_matrix = pts[feasible], val[feasible], hrs_tot[feasible], req_matrix[feasible]
+points = dict(zip(S, pts.tolist()))
+value  = dict(zip(S, val.tolist()))
+deps = [(s,p) for (s,p) in deps if s in points]
+req = {(s,r): v for s, row in zip(S, req_matrix.tolist()) for r, v in zip(ROLES, row)}
 
-# Decision variables
-x = pl.LpVariable.dicts("x", [(i,s) for i in I for s in S], lowBound=0, cat=pl.LpContinuous)
-z = pl.LpVariable.dicts("z", S, lowBound=0, upBound=1, cat=pl.LpBinary)
-y = pl.LpVariable.dicts("y", I, lowBound=0, upBound=1, cat=pl.LpBinary)
-owner = pl.LpVariable.dicts("owner", [(i,s) for i in I for s in S], lowBound=0, upBound=1, cat=pl.LpBinary)
-rel = pl.LpVariable.dicts("rel", I, lowBound=0, upBound=1, cat=pl.LpBinary)
+# Solvers stop at whichever gap is met first, so an absolute gap alone would not help: cap the
+# relative gap so that its absolute size (at most gap * total value) stays below lambda/2.
+# Otherwise a gap exit keeps plans with extra active people and is still reported as optimal.
+mip_gap = min(mip_gap_rel, 0.5 * lambda_people / max(float(val.sum()), 1.0)) if lambda_people > 0 else mip_gap_rel
 
-# Objective: maximize value - lambda * active people
-m += pl.lpSum(value[s]*z[s] for s in S) - lambda_people * pl.lpSum(y[i] for i in I)
+# Owner candidates: devs who can hold the story's points and theta hours (OwnerHours/PointsCap
+# rule out everyone else); any dev may own a story, even one with no work for its role
+devs = [i for i in I if role_of[i] in ("BE","FE")]
+owner_cand = {s: [i for i in devs
+                  if cap_i[i] >= theta_release_hours and points[s] <= max_points_per_dev] for s in S}
+owned_by = {i: [s for s in S if i in owner_cand[s]] for i in devs}
 
-# Capacity per person
-for i in I:
-    m += pl.lpSum(x[(i,s)] for s in S) <= cap_i[i] * y[i], f"Cap_{i}"
+# Integer positions of people/stories/devs, and the candidate sets by position
+i_pos = {i: a for a, i in enumerate(I)}
+s_pos = {s: b for b, s in enumerate(S)}
+d_pos = {i: d for d, i in enumerate(devs)}
+dev_rows = [i_pos[i] for i in devs]
+cand_idx = [[d_pos[i] for i in owner_cand[s]] for s in S]
+owned_idx = [[s_pos[s] for s in owned_by[i]] for i in devs]
 
-# Role coverage per story
-for s in S:
-    for r in ("BE","FE","QA","TL","ARQ"):
-        if r in I_by_role:  # only if we have people in that role
-            m += pl.lpSum(x[(i,s)] for i in I_by_role[r]) >= req[(s,r)] * z[s], f"Req_{r}_{s}"
+# ---------- Warm start ----------
+def greedy_pass(order):
+    """One greedy pass over the story ids in order; see greedy_plan().
 
-# Aggregate role capacity (bugs + buffer for QA)
-for r in ("BE","FE","QA","TL","ARQ"):
-    if r in I_by_role:
-        m += pl.lpSum(x[(i,s)] for s in S for i in I_by_role[r]) <= role_cap_eff[r], f"RoleCap_{r}"
+    Returns (chosen stories, owner per story, hours per (person, story), stories to drop).
+    """
+    members = {r: [I[a] for a in idx_of[r]] for r in staffed_roles}
+    pred = dict(deps)
+    rem_role = {r: role_cap_eff.get(r,0.0) for r in staffed_roles}
+    rem_hours = dict(cap_i)
+    rem_points = {i: max_points_per_dev for i in devs}
+    chosen, owner_of, hours, lent = set(), {}, defaultdict(float), set()
+    for s in order:
+        if pred.get(s) in s_pos and pred[s] not in chosen:
+            continue
+        cands = [i for i in owner_cand[s] if rem_points[i] >= points[s] and rem_hours[i] >= theta_release_hours]
+        if not cands:
+            continue
+        # owner: a dev that lent hours but owns nothing yet, then a dev of a role with no owner
+        # (its hours need not be lent), then the least-loaded one (most points, then hours left)
+        owned_roles = {role_of[i] for i in owner_of.values()}
+        def rank(i):
+            if i in lent and rem_points[i] == max_points_per_dev:
+                return 2
+            return 0 if role_of[i] in owned_roles else 1
+        o = max(cands, key=lambda i: (rank(i), rem_points[i], rem_hours[i]))
+        need = {r: req[(s,r)] for r in rem_role}
+        need[role_of[o]] = max(need[role_of[o]], theta_release_hours)
+        pools = {}
+        for r, h in need.items():
+            pool = [i for i in members[r]
+                    if r not in ("BE","FE") or i == o or rem_points[i] < max_points_per_dev]
+            if not pool:  # no owner in this role yet: one dev lends the hours and owns next
+                lenders = [i for i in members[r] if rem_hours[i] >= theta_release_hours]
+                pool = [max(lenders, key=lambda i: rem_hours[i])] if lenders else []
+            if h > rem_role[r] or h > sum(rem_hours[i] for i in pool):
+                break
+            pools[r] = pool
+        else:
+            for r, pool in pools.items():
+                h = need[r]
+                if r == role_of[o]:
+                    hours[(o,s)] += theta_release_hours
+                    rem_hours[o] -= theta_release_hours
+                    rem_role[r] -= theta_release_hours
+                    h -= theta_release_hours
+                free = sum(rem_hours[i] for i in pool)
+                if h <= 0 or free <= 0:
+                    continue
+                for i in pool:
+                    share = h * rem_hours[i] / free
+                    hours[(i,s)] += share
+                    rem_hours[i] -= share
+                    if i in rem_points and i != o:
+                        lent.add(i)
+                rem_role[r] -= h
+            chosen.add(s)
+            owner_of[s] = o
+            rem_points[o] -= points[s]
+    # A dev that only lent hours and never got to own a story would break the release rule:
+    # report the stories it lent to, so greedy_plan() can drop them and retry
+    bad = {s for (i,s), h in hours.items() if h > 0 and i in lent and rem_points[i] == max_points_per_dev}
+    return chosen, owner_of, hours, bad
 
-# Owners: exactly one owner among devs if story selected
-devs = [i for i in I if role_of[i] in ("BE","FE")]
-for s in S:
-    m += pl.lpSum(owner[(i,s)] for i in devs) == z[s], f"OwnerOne_{s}"
-    # Link owner to hours (if owner=1 must invest at least theta hours)
-    for i in devs:
-        m += pl.lpSum(x[(i,s)]) >= theta_release_hours * owner[(i,s)], f"OwnerHours_{i}_{s}"
+def greedy_plan(order):
+    """Build a feasible plan by taking stories (indices into S) in the given order while capacity allows.
 
-# Points cap per dev (sum of points of owned stories <= 13)
-for i in devs:
-    m += pl.lpSum(points[s]*owner[(i,s)] for s in S) <= max_points_per_dev, f"PointsCap_{i}"
+    The owner is the least-loaded dev with points left; the remaining role hours are spread
+    over the role's people proportionally to their free hours. Dev hours only go to devs that
+    already own a story, or to a single lender per role that is picked as the next owner.
+    If a lender never gets to own, the stories it lent to are dropped and the plan is rebuilt.
+    Returns (chosen[s], owner index into I per story or -1, hours[i, s]).
+    """
+    order = [S[b] for b in order]
+    while True:
+        chosen, owner_of, hours, bad = greedy_pass(order)
+        if not bad:
+            break
+        order = [s for s in order if s not in bad]
+    g_hours = np.zeros((len(I), len(S)))
+    for (i,s), h in hours.items():
+        g_hours[i_pos[i], s_pos[s]] = h
+    return (np.array([s in chosen for s in S], dtype=bool),
+            np.array([i_pos[owner_of[s]] if s in owner_of else -1 for s in S], dtype=np.int64), g_hours)
 
-# Releases: every active dev must release at least one story
-for i in devs:
-    # rel_i <= sum owners; and rel_i >= y_i (if active -> must release at least one)
-    m += rel[i] <= pl.lpSum(owner[(i,s)] for s in S), f"RelLink_{i}"
-    m += rel[i] >= y[i], f"RelActive_{i}"
+def report_lp_only(solver_label, status, lp_bound):
+    """Print the LP relaxation bound and stop (lp_only: true); results/ is left untouched."""
+    print("LP relaxation.", "Solver:", solver_label, "Status:", status,
+          "Bound:", None if lp_bound is None else round(lp_bound,3))
+    sys.exit(0)
 
-# Dependencies: z_s <= z_p if s depends on p
-for (s,p) in deps:
-    if p in S:  # only enforce if predecessor not forbidden
-        m += z[s] <= z[p], f"Dep_{s}_on_{p}"
+def solve_pulp():
+    """Build the PuLP model, seed it with the greedy plan (if the backend takes a MIP start) and solve it with pick_solver()."""
+    m = pl.LpProblem("SprintPlanningMILP", pl.LpMaximize)
+    nI, nS, nD = len(I), len(S), len(devs)
 
-# Solve
-solver = pl.PULP_CBC_CMD(msg=False)
-res = m.solve(solver)
+    # Decision variables in integer-indexed arrays (x[a,b] is person I[a] on story S[b]);
+    # names are mapped back to people/stories only at output time
+    Xv = np.empty((nI, nS), dtype=object)
+    for a in range(nI):
+        for b in range(nS):
+            Xv[a,b] = pl.LpVariable(f"x_{a}_{b}", lowBound=0, cat=pl.LpContinuous)
+    Zv = [pl.LpVariable(f"z_{b}", lowBound=0, upBound=1, cat=pl.LpBinary) for b in range(nS)]
+    Yv = [pl.LpVariable(f"y_{a}", lowBound=0, upBound=1, cat=pl.LpBinary) for a in range(nI)]
+    OWNv = np.full((nD, nS), None, dtype=object)  # only owner candidates get a variable
+    for b in range(nS):
+        for d in cand_idx[b]:
+            OWNv[d,b] = pl.LpVariable(f"owner_{d}_{b}", lowBound=0, upBound=1, cat=pl.LpBinary)
+
+    # Constraints are built from (var, coef) lists in one LpAffineExpression call each,
+    # avoiding lpSum's per-term __iadd__
+    Aff = pl.LpAffineExpression
+
+    # Objective: maximize value - lambda * active people
+    m += Aff([(Zv[b], value[S[b]]) for b in range(nS)] + [(Yv[a], -lambda_people) for a in range(nI)])
+
+    # Capacity per person
+    for a, i in enumerate(I):
+        m += Aff([(v, 1.0) for v in Xv[a]] + [(Yv[a], -cap_i[i])]) <= 0, f"Cap_{i}"
+
+    # Role coverage per story
+    for b, s in enumerate(S):
+        for r in staffed_roles:  # only if we have people in that role
+            m += Aff([(v, 1.0) for v in Xv[idx_of[r], b]] + [(Zv[b], -req[(s,r)])]) >= 0, f"Req_{r}_{s}"
+
+    # Aggregate role capacity (bugs + buffer for QA)
+    for r in staffed_roles:
+        m += Aff([(v, 1.0) for v in Xv[idx_of[r], :].ravel()]) <= role_cap_eff[r], f"RoleCap_{r}"
+
+    # Owners: exactly one owner among candidate devs if story selected
+    for b, s in enumerate(S):
+        m += Aff([(OWNv[d,b], 1.0) for d in cand_idx[b]] + [(Zv[b], -1.0)]) == 0, f"OwnerOne_{s}"
+        # Link owner to hours (if owner=1 must invest at least theta hours)
+        for d in cand_idx[b]:
+            m += Aff([(Xv[dev_rows[d],b], 1.0), (OWNv[d,b], -theta_release_hours)]) >= 0, f"OwnerHours_{devs[d]}_{s}"
+
+    # Points cap per dev (sum of points of owned stories <= 13), scaled by y_i so that
+    # owning a story implies being active (owner <= y) without extra rows
+    for d, i in enumerate(devs):
+        a = dev_rows[d]
+        m += Aff([(OWNv[d,b], points[S[b]]) for b in owned_idx[d]] + [(Yv[a], -max_points_per_dev)]) <= 0, f"PointsCap_{i}"
+
+    # Releases: every active dev must release at least one story
+    for d, i in enumerate(devs):
+        a = dev_rows[d]
+        # sum owners >= y_i (if active -> must release at least one)
+        m += Aff([(OWNv[d,b], 1.0) for b in owned_idx[d]] + [(Yv[a], -1.0)]) >= 0, f"Release_{i}"
+
+    # Dependencies: z_s <= z_p if s depends on p
+    for (s,p) in deps:
+        if p in s_pos:  # only enforce if predecessor not forbidden
+            m += Aff([(Zv[s_pos[s]], 1.0), (Zv[s_pos[p]], -1.0)]) <= 0, f"Dep_{s}_on_{p}"
+
+    solver = pick_solver(solver_name)
+
+    # LP relaxation first: a quick upper bound on the objective and a guide for the warm start
+    binaries = Zv + Yv + [v for v in OWNv.ravel() if v is not None]
+    for v in binaries:
+        v.cat = pl.LpContinuous
+    t0 = time.perf_counter()
+    m.solve(solver)
+    if time_limit_s is not None:  # the LP time comes out of the MIP budget
+        solver.timeLimit = mip_time_left(time.perf_counter() - t0)
+    lp_bound = pl.value(m.objective) if m.status == pl.LpStatusOptimal else None
+    lp_z = np.array([v.value() or 0.0 for v in Zv])
+    for v in binaries:
+        v.cat = pl.LpInteger  # PuLP stores binaries as 0/1-bounded integers
+    if lp_only:
+        report_lp_only(solver.name, pl.LpStatus[m.status], lp_bound)
 
-status = pl.LpStatus[m.status]
-obj = pl.value(m.objective)
+    if solver.optionsDict.get("warmStart"):
+        seed_pulp_start(Xv, Zv, OWNv, Yv, lp_z)
+    m.solve(solver)
+    return read_pulp_solution(m, solver, Xv, Zv, OWNv, Yv, lp_bound)
+
+def mip_time_left(lp_elapsed):
+    """MIP time limit once the LP relaxation has used lp_elapsed seconds.
+
+    Clamped to the remaining budget, kept just above 0 so the solver still gets a positive limit.
+    """
+    return max(time_limit_s - lp_elapsed, 1e-3)
+
+def seed_pulp_start(Xv, Zv, OWNv, Yv, lp_z):
+    """Set the better greedy plan (value density first, or LP z values first) as the MIP start.
+
+    Rounded LP binaries are rarely feasible, so the LP only orders the greedy.
+    """
+    nI, nS = Xv.shape
+    g_chosen, g_owner, g_hours = max((greedy_plan(np.argsort(-(val/pts), kind="stable")),
+                                      greedy_plan(np.lexsort((-(val/pts), -lp_z)))),
+                                     key=lambda g: val[g[0]].sum() - lambda_people * (g[2].sum(axis=1) > 0).sum())
+    for a in range(nI):
+        active = g_hours[a].sum() > 0
+        Yv[a].setInitialValue(int(active))
+        for b in range(nS):
+            Xv[a,b].setInitialValue(float(g_hours[a,b]))
+    for b in range(nS):
+        Zv[b].setInitialValue(int(g_chosen[b]))
+        for d in cand_idx[b]:
+            OWNv[d,b].setInitialValue(int(g_owner[b] == dev_rows[d]))
+
+def read_pulp_solution(m, solver, Xv, Zv, OWNv, Yv, lp_bound):
+    """Check the solve status and read the variable values into the solution arrays."""
+    status = pl.LpStatus[m.status]
+    # A time-limit exit reports Not Solved (HiGHS) or Optimal (CBC) but may still carry an incumbent
+    has_incumbent = m.sol_status in (pl.LpSolutionOptimal, pl.LpSolutionIntegerFeasible)
+    if m.status not in (pl.LpStatusOptimal, pl.LpStatusNotSolved) or not has_incumbent:
+        print("No se encontró un plan factible.", "Status:", status)
+        sys.exit(1)
+    if m.sol_status == pl.LpSolutionIntegerFeasible:
+        status = "Feasible (time limit / gap)"
+    obj = pl.value(m.objective)
+    # Read every variable once into arrays; the outputs work on these only
+    sol = {"X": np.array([[v.value() or 0.0 for v in row] for row in Xv]),
+           "Z": np.array([v.value() > 0.5 for v in Zv], dtype=bool),
+           "OWN": np.array([[v is not None and v.value() > 0.5 for v in row] for row in OWNv],
+                           dtype=bool).reshape(OWNv.shape),  # keeps (0, nS) when there are no devs
+           "Y": np.array([v.value() > 0.5 for v in Yv], dtype=bool), "lp_bound": lp_bound}
+    return solver.name, status, obj, sol
+
+def solve_matrix():
+    """Assemble the same MILP as a sparse COO matrix and solve it with scipy.optimize.milp (HiGHS).
+
+    Columns: x[i,s] | z[s] | y[i] | owner[i,s] (candidates only). Rows are appended as
+    (row, col, coef) triplets to plain lists, so no PuLP variable or expression objects are created.
+    """
+    try:
+        from scipy.optimize import milp, LinearConstraint, Bounds
+        from scipy.sparse import coo_matrix
+    except Exception:
+        print("SciPy no está instalado en este entorno (necesario para solver: SCIPY_MILP).\n"
+              "  pip install scipy\n")
+        sys.exit(1)
+
+    nI, nS = len(I), len(S)
+    idx_x = np.arange(nI*nS).reshape(nI, nS)
+    idx_z = nI*nS + np.arange(nS)
+    idx_y = nI*nS + nS + np.arange(nI)
+    own_keys = [(i,s) for s in S for i in owner_cand[s]]
+    idx_owner = {k: nI*nS + nS + nI + n for n, k in enumerate(own_keys)}
+    ncols = nI*nS + nS + nI + len(own_keys)
+    ip, sp = i_pos, s_pos
+
+    rows, cols, data, row_lb, row_ub = [], [], [], [], []
+    def add_row(terms, lo, hi):
+        r = len(row_lb)
+        for col, coef in terms:
+            rows.append(r); cols.append(col); data.append(coef)
+        row_lb.append(lo); row_ub.append(hi)
+
+    # Objective (milp minimizes): -(value - lambda * active people)
+    c = np.zeros(ncols)
+    c[idx_z] = -val
+    c[idx_y] = lambda_people
+
+    for i in I:
+        add_row([(idx_x[ip[i],k], 1.0) for k in range(nS)] + [(idx_y[ip[i]], -cap_i[i])], -np.inf, 0.0)
+    for s in S:
+        for r in staffed_roles:
+            add_row([(col, 1.0) for col in idx_x[idx_of[r], sp[s]]] + [(idx_z[sp[s]], -req[(s,r)])], 0.0, np.inf)
+    for r in staffed_roles:
+        add_row([(col, 1.0) for col in idx_x[idx_of[r], :].ravel()], -np.inf, role_cap_eff[r])
+    for s in S:
+        add_row([(idx_owner[(i,s)], 1.0) for i in owner_cand[s]] + [(idx_z[sp[s]], -1.0)], 0.0, 0.0)
+        for i in owner_cand[s]:
+            add_row([(idx_x[ip[i],sp[s]], 1.0), (idx_owner[(i,s)], -theta_release_hours)], 0.0, np.inf)
+    for i in devs:
+        add_row([(idx_owner[(i,s)], points[s]) for s in owned_by[i]] + [(idx_y[ip[i]], -max_points_per_dev)],
+                -np.inf, 0.0)
+        add_row([(idx_owner[(i,s)], 1.0) for s in owned_by[i]] + [(idx_y[ip[i]], -1.0)], 0.0, np.inf)
+    for (s,p) in deps:
+        if p in sp:
+            add_row([(idx_z[sp[s]], 1.0), (idx_z[sp[p]], -1.0)], -np.inf, 0.0)
+
+    A = coo_matrix((np.array(data), (np.array(rows), np.array(cols))), shape=(len(row_lb), ncols)).tocsc()
+    integrality = np.ones(ncols)
+    integrality[idx_x.ravel()] = 0
+    ub = np.ones(ncols)
+    ub[idx_x.ravel()] = np.inf
+    constraints, bounds = LinearConstraint(A, row_lb, row_ub), Bounds(np.zeros(ncols), ub)
+    options = {"disp": False, "presolve": True, "mip_rel_gap": mip_gap}
+    if time_limit_s is not None:
+        options["time_limit"] = time_limit_s
+    # LP relaxation first: a quick upper bound on the objective
+    t0 = time.perf_counter()
+    res_lp = milp(c, constraints=constraints, integrality=np.zeros(ncols), bounds=bounds, options=options)
+    if time_limit_s is not None:
+        options["time_limit"] = mip_time_left(time.perf_counter() - t0)
+    lp_bound = -res_lp.fun if res_lp.status == 0 else None
+    if lp_only:
+        report_lp_only("SCIPY_MILP", res_lp.message, lp_bound)
+    res = milp(c, constraints=constraints, integrality=integrality, bounds=bounds, options=options)
+
+    # 0: optimal, 1: iteration/time limit (may carry an incumbent)
+    if res.x is None or res.status not in (0, 1):
+        print("No se encontró un plan factible.", "Status:", res.message)
+        sys.exit(1)
+    status = "Optimal" if res.status == 0 else "Feasible (time limit / gap)"
+    v = res.x
+    OWN = np.zeros((len(devs), nS), dtype=bool)
+    for (i,s), n in idx_owner.items():
+        OWN[d_pos[i], sp[s]] = v[n] > 0.5
+    sol = {"X": v[idx_x], "Z": v[idx_z] > 0.5, "OWN": OWN,
+           "Y": v[idx_y] > 0.5, "lp_bound": lp_bound}
+    return "SCIPY_MILP", status, 0.0 - res.fun, sol  # 0.0 - : no "-0.0" for an empty plan
+
+# Solve
+if solver_name == "SCIPY_MILP":
+    solver_label, status, obj, sol = solve_matrix()
+else:
+    solver_label, status, obj, sol = solve_pulp()
+X, Z, OWN, Y = sol["X"], sol["Z"], sol["OWN"], sol["Y"]
+# release(rel) is derived: the person is a dev owning at least one selected story
+REL = np.zeros(len(I), dtype=bool)
+REL[dev_rows] = OWN.any(axis=1)
 
 # ---------- Outputs ----------
 # Selected stories
-sel = []
-for s in S:
-    if pl.value(z[s]) > 0.5:
-        # find owner and role
-        owner_i = None
-        for i in devs:
-            if pl.value(owner[(i,s)]) > 0.5:
-                owner_i = i
-                break
-        sel.append([s, points[s], value[s], owner_i])
-
-with open(os.path.join(OUT,"selected_stories.csv"),"w",encoding="utf-8",newline="") as f:
-    w = csv.writer(f); w.writerow(["story_id","points","value","owner"])
-    for row in sel:
-        w.writerow(row)
+sel_idx = np.nonzero(Z)[0]
+# owner: exactly one per selected story (OwnerOne), so a column argmax finds it
+has_owner = OWN.any(axis=0)
+own_arg = OWN.argmax(axis=0) if len(devs) else np.zeros(len(S), dtype=int)
+owners = [devs[own_arg[k]] if has_owner[k] else None for k in sel_idx]
+sel = pd.DataFrame({"story_id": np.array(S, dtype=object)[sel_idx], "points": pts[sel_idx],
+                    "value": val[sel_idx], "owner": owners})
+# CRLF line endings, as csv.writer wrote them before the switch to pandas
+CSV_OPTS = {"index": False, "lineterminator": "\r\n"}
+sel.to_csv(os.path.join(OUT,"selected_stories.csv"), **CSV_OPTS)
 
 # Assignments
-assign_rows = []
-for i in I:
-    for s in S:
-        hrs = pl.value(x[(i,s)])
-        if hrs and hrs>1e-4:
-            assign_rows.append([i, role_of[i], s, round(hrs,2)])
-with open(os.path.join(OUT,"assignments.csv"),"w",encoding="utf-8",newline="") as f:
-    w = csv.writer(f); w.writerow(["person","role","story_id","hours"])
-    for row in assign_rows:
-        w.writerow(row)
+I_arr, S_arr = np.array(I, dtype=object), np.array(S, dtype=object)
+mask = X > 1e-4
+ii, ss = np.nonzero(mask)
+pd.DataFrame({"person": I_arr[ii], "role": role_arr[ii], "story_id": S_arr[ss],
+              "hours": X[mask].round(2)}).to_csv(os.path.join(OUT,"assignments.csv"), **CSV_OPTS)
 
 # Utilization per person
-util = []
-for i in I:
-    used = sum(pl.value(x[(i,s)]) for s in S)
-    util.append([i, role_of[i], round(used or 0.0,2), cap_i[i], round((used or 0.0)/cap_i[i],3), int(pl.value(y[i])>0.5), int(pl.value(rel[i] or 0.0)>0.5)])
-with open(os.path.join(OUT,"person_utilization.csv"),"w",encoding="utf-8",newline="") as f:
-    w = csv.writer(f); w.writerow(["person","role","hours_used","capacity","utilization","active(y)","release(rel)"])
-    for row in util:
-        w.writerow(row)
+used_h = X.sum(axis=1)
+pd.DataFrame({"person": I_arr, "role": role_arr, "hours_used": used_h.round(2), "capacity": cap_arr,
+              "utilization": (used_h/cap_arr).round(3),
+              "active(y)": Y.astype(int), "release(rel)": REL.astype(int),
+              }).to_csv(os.path.join(OUT,"person_utilization.csv"), **CSV_OPTS)
 
 # Summary
 with open(os.path.join(OUT,"summary.txt"),"w",encoding="utf-8") as f:
     f.write(f"Status: {status}\n")
+    f.write(f"Solver: {solver_label}\n")
     f.write(f"Objective (value - lambda*people): {obj:.3f}\n")
-    val_total = sum(value[s] for s in S if pl.value(z[s])>0.5)
-    active_people = sum(1 for i in I if pl.value(y[i])>0.5)
+    if sol.get("lp_bound") is not None:
+        f.write(f"LP relaxation bound: {sol['lp_bound']:.3f}\n")
+        f.write(f"Gap to LP bound: {(sol['lp_bound'] - obj) / max(abs(sol['lp_bound']), 1e-9):.2%}\n")
+    val_total = float(val[Z].sum())
+    active_people = int(Y.sum())
     f.write(f"Delivered value: {val_total:.3f}\n")
     f.write(f"Active people: {active_people}\n")
-    f.write(f"Stories selected: {len(sel)} / {len(S)}\n")
+    f.write(f"Stories selected: {len(sel)} / {n_stories}\n")
+    f.write(f"Stories pruned as infeasible: {n_stories - len(S)}\n")
     f.write(f"Dependencies respected: {len(deps)}\n")
     f.write("\nParameters:\n")
     f.write(f"  hours_per_point={hours_per_point:.4f}\n")